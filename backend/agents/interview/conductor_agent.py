@@ -6,6 +6,7 @@ Uses Gemini 2.5 Flash for low-latency voice interaction.
 
 import random
 import logging
+from functools import lru_cache
 from google.adk.agents import LlmAgent
 from google.genai import types
 
@@ -79,6 +80,25 @@ INTERVIEWER_NAMES = [
 ]
 
 
+# Per-session fields left as placeholders in the cached prompt
+_SESSION_FIELDS = ("interviewer_name", "interviewer_role", "candidate_name")
+
+
+@lru_cache(maxsize=128)
+def build_system_prompt(company: str, position: str, total_questions: int) -> str:
+    """Render the conductor instruction for a company/position/question count.
+
+    Interviewer and candidate fields are kept as {placeholders} so the result can
+    be shared across sessions; create_conductor_agent fills them in.
+    """
+    return CONDUCTOR_INSTRUCTION.format(
+        company=company,
+        position=position,
+        total_questions=total_questions,
+        **{field: "{" + field + "}" for field in _SESSION_FIELDS},
+    )
+
+
 def create_conductor_agent(
     candidate_name: str,
     company: str,
@@ -95,13 +115,13 @@ def create_conductor_agent(
     """
     interviewer_name, interviewer_role = random.choice(INTERVIEWER_NAMES)
 
-    instruction = CONDUCTOR_INSTRUCTION.format(
-        interviewer_name=interviewer_name,
-        interviewer_role=interviewer_role,
-        candidate_name=candidate_name,
-        company=company,
-        position=position,
-        total_questions=total_questions,
+    # Plain replace rather than a second format(): company/position are user
+    # input already rendered into the prompt and may contain braces.
+    instruction = (
+        build_system_prompt(company, position, total_questions)
+        .replace("{interviewer_name}", interviewer_name)
+        .replace("{interviewer_role}", interviewer_role)
+        .replace("{candidate_name}", candidate_name)
     )
 
     agent = LlmAgent(
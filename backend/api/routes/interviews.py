@@ -47,7 +47,7 @@ async def start_interview(request: StartInterviewRequest):
 @router.get("/{session_id}/status", response_model=InterviewStatusResponse)
 async def get_interview_status(session_id: str):
     """Get current interview status and progress."""
-    session = session_manager.get_session(session_id)
+    session = await session_manager.get_or_restore_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
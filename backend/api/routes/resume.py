@@ -5,14 +5,15 @@ Resume API routes - handles resume upload, annotation, and feedback.
 import os
 import uuid
 import time
+import asyncio
 import logging
 import json
 from typing import Optional, Dict, Any
 from pathlib import Path
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request
+from fastapi.responses import JSONResponse, FileResponse, Response
 from pydantic import BaseModel
-import pathlib
+from cachetools import TTLCache
 
 from agents.resume.feedback_agent import ResumeFeedbackAgent
 from agents.resume.annotation_agent import ResumeAnnotationAgent
@@ -41,6 +42,33 @@ annotation_agent = ResumeAnnotationAgent()
 # Create upload directory
 UPLOAD_DIR = Path("uploads/resumes")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+_UPLOAD_DIR_STR = str(UPLOAD_DIR)
+
+# Upper bound on a single Gemini chat generation before the request gives up
+CHAT_TIMEOUT_SECONDS = 30
+
+# Strong references to fire-and-forget cleanup tasks so they aren't GC'd mid-flight
+_background_tasks: set = set()
+
+# Absorbs bursts of frontend polling against the same resume_sessions document
+_firestore_cache: TTLCache = TTLCache(maxsize=1024, ttl=5)
+
+# Resume PDFs never change after upload, so let the browser's PDF viewer reuse them
+_PDF_CACHE_CONTROL = "private, max-age=3600"
+
+
+def _session_pdf_path(session_id: str) -> Path:
+    """Local path of the uploaded resume PDF for a session."""
+    return UPLOAD_DIR.joinpath(f"{session_id}.pdf")
+
+
+async def get_resume_analysis_cached(session_id: str) -> Optional[dict]:
+    """Get the resume analysis document, served from a short-lived cache when possible."""
+    if session_id in _firestore_cache:
+        return _firestore_cache[session_id]
+    doc = await firestore_service.get_resume_analysis(session_id)
+    _firestore_cache[session_id] = doc
+    return doc
 
 
 @router.post("/upload")
@@ -80,11 +108,10 @@ async def upload_resume(
         if not filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are allowed")
         
-        # Generate unique session ID and filename
-        session_id = str(uuid.uuid4())
-        file_extension = Path(filename).suffix
-        safe_filename = f"{session_id}{file_extension}"
-        file_path = UPLOAD_DIR / safe_filename
+        # Generate unique session ID; the .pdf suffix is guaranteed by the check above
+        session_id = uuid.uuid4().hex
+        file_path = _session_pdf_path(session_id)
+        file_path_str = str(file_path)
         
         # Save file
         logger.info(f"Saving file to: {file_path}")
@@ -96,24 +123,22 @@ async def upload_resume(
         logger.info(f"File saved successfully: {file_path.exists()}")
 
         # Upload to Firebase Storage (non-blocking best-effort)
-        await storage_service.upload_resume(session_id, str(file_path))
+        await storage_service.upload_resume(session_id, file_path_str)
 
         # Parse target companies
         companies_list = [c.strip() for c in target_companies.split(",") if c.strip()]
         
         # Run annotation and feedback agents in parallel
-        import asyncio
-        
         feedback_task = feedback_agent.analyze_resume_document(
             session_id,
-            str(file_path),
+            file_path_str,
             target_position,
             companies_list
         )
         
         annotation_task = annotation_agent.annotate_resume_document(
             session_id,
-            str(file_path)
+            file_path_str
         )
         
         # Wait for both to complete (don't wait for annotation before feedback)
@@ -122,23 +147,25 @@ async def upload_resume(
             annotation_task,
             return_exceptions=True
         )
+
+        # Normalize results once so every consumer below sees the same payload
+        feedback_payload = {} if isinstance(feedback_result, Exception) else feedback_result.get("feedback", {})
+        annotation_payload = {} if isinstance(annotation_result, Exception) else annotation_result
         
         # Handle feedback result
         if isinstance(feedback_result, Exception):
             logger.error(f"Feedback analysis failed: {feedback_result}")
-            feedback_result = {"error": str(feedback_result)}
         else:
             # Save potential questions to centralized cache
-            potential_questions = feedback_result.get("feedback", {}).get("potential_questions", [])
+            potential_questions = feedback_payload.get("potential_questions", [])
             if potential_questions:
-                questions_cache.set_questions(session_id, potential_questions)
-                questions_cache.cleanup_old_sessions()  # Clean up old sessions
+                await questions_cache.set_questions(session_id, potential_questions)
+                await questions_cache.cleanup_old_sessions()  # Clean up old sessions
                 logger.info(f"Saved {len(potential_questions)} potential questions for session {session_id}")
         
         # Handle annotation result
         if isinstance(annotation_result, Exception):
             logger.error(f"Annotation failed: {annotation_result}")
-            annotation_result = {"error": str(annotation_result)}
         else:
             logger.info(f"Annotation completed for session {session_id}")
 
@@ -146,19 +173,20 @@ async def upload_resume(
         cached_questions = questions_cache.get_questions(session_id)
         await firestore_service.save_resume_analysis(session_id, {
             "session_id": session_id,
-            "analysis": feedback_result.get("feedback", {}) if not isinstance(feedback_result, Exception) else {},
-            "annotations": annotation_result if not isinstance(annotation_result, Exception) else {},
+            "analysis": feedback_payload,
+            "annotations": annotation_payload,
             "questions": cached_questions.get("questions", []) if cached_questions else [],
             "created_at": time.time(),
         })
+        _firestore_cache.pop(session_id, None)
 
         return {
             "session_id": session_id,
             "filename": filename,
             "target_position": target_position,
             "target_companies": companies_list,
-            "analysis_result": feedback_result.get("feedback", {}) if not isinstance(feedback_result, Exception) else {},
-            "annotation_result": annotation_result if not isinstance(annotation_result, Exception) else {},
+            "analysis_result": feedback_payload,
+            "annotation_result": annotation_payload,
             "status": "uploaded"
         }
         
@@ -278,8 +306,17 @@ async def get_resume_status(session_id: str):
         Current processing status and available results
     """
     try:
-        # In production, you'd check a database or session store
-        # For now, return a basic status
+        doc = await get_resume_analysis_cached(session_id)
+        if doc:
+            return {
+                "session_id": session_id,
+                "status": "processed",
+                "has_annotation": bool(doc.get("annotations")),
+                "has_analysis": bool(doc.get("analysis")),
+                "created_at": doc.get("created_at"),
+            }
+
+        # Firestore not configured or no document yet: return a basic status
         return {
             "session_id": session_id,
             "status": "processed",
@@ -332,7 +369,7 @@ async def get_resume_analysis(session_id: str):
         # For now, we'll need to re-run feedback since we don't cache the full analysis
         # In production, you'd want to cache the full analysis like questions
         # Try Firestore first (survives server restarts)
-        doc = await firestore_service.get_resume_analysis(session_id)
+        doc = await get_resume_analysis_cached(session_id)
         if doc and doc.get("analysis"):
             logger.info(f"Returning cached analysis from Firestore for {session_id}")
             return {
@@ -341,11 +378,12 @@ async def get_resume_analysis(session_id: str):
                 "status": "found"
             }
 
-        resume_path = pathlib.Path(f"uploads/resumes/{session_id}.pdf")
+        resume_path = _session_pdf_path(session_id)
+        resume_path_str = str(resume_path)
 
         if not resume_path.exists():
             logger.info(f"Local file missing for {session_id}, trying Firebase Storage")
-            restored = await storage_service.download_resume(session_id, str(resume_path))
+            restored = await storage_service.download_resume(session_id, resume_path_str)
             if not restored:
                 logger.error(f"Resume file not found for sessionId: {session_id}")
                 raise HTTPException(status_code=404, detail="Resume file not found for analysis")
@@ -355,7 +393,7 @@ async def get_resume_analysis(session_id: str):
         # Re-run analysis (this is not ideal but works for now)
         analysis_result = await feedback_agent.analyze_resume_document(
             session_id,
-            str(resume_path),
+            resume_path_str,
             "Software Engineer",  # Default, could be stored with session
             ["Grab", "Shopee", "Google"]  # Default, could be stored with session
         )
@@ -387,7 +425,7 @@ async def get_resume_annotations(session_id: str):
         logger.info(f"Backend received sessionId for annotations: {session_id}")
         
         # Try Firestore first (survives server restarts)
-        doc = await firestore_service.get_resume_analysis(session_id)
+        doc = await get_resume_analysis_cached(session_id)
         if doc and doc.get("annotations"):
             logger.info(f"Returning cached annotations from Firestore for {session_id}")
             ann = doc["annotations"]
@@ -398,18 +436,19 @@ async def get_resume_annotations(session_id: str):
                 "status": "found"
             }
 
-        resume_path = pathlib.Path(f"uploads/resumes/{session_id}.pdf")
+        resume_path = _session_pdf_path(session_id)
+        resume_path_str = str(resume_path)
 
         if not resume_path.exists():
             logger.info(f"Local file missing for {session_id}, trying Firebase Storage")
-            restored = await storage_service.download_resume(session_id, str(resume_path))
+            restored = await storage_service.download_resume(session_id, resume_path_str)
             if not restored:
                 logger.error(f"Resume file not found for annotations sessionId: {session_id}")
                 raise HTTPException(status_code=404, detail="Resume file not found for annotation")
 
         logger.info(f"Resume file exists for annotations sessionId: {session_id}")
 
-        annotation_result = await annotation_agent.annotate_resume_document(session_id, str(resume_path))
+        annotation_result = await annotation_agent.annotate_resume_document(session_id, resume_path_str)
         
         logger.info(f"Annotation result for sessionId {session_id}: {annotation_result.get('status', 'unknown')}")
         
@@ -440,7 +479,7 @@ async def get_resume_questions(session_id: str):
 
         if not questions_data:
             # Fallback: try Firestore
-            doc = await firestore_service.get_resume_analysis(session_id)
+            doc = await get_resume_analysis_cached(session_id)
             if doc and doc.get("questions"):
                 logger.info(f"Returning cached questions from Firestore for {session_id}")
                 return {
@@ -469,11 +508,12 @@ async def chat_with_resume(session_id: str, request: ChatRequest):
     
     try:
         # Find the uploaded resume file
-        resume_path = pathlib.Path(f"uploads/resumes/{session_id}.pdf")
+        resume_path = _session_pdf_path(session_id)
+        resume_path_str = str(resume_path)
 
         if not resume_path.exists():
             logger.info(f"Local file missing for {session_id}, trying Firebase Storage")
-            restored = await storage_service.download_resume(session_id, str(resume_path))
+            restored = await storage_service.download_resume(session_id, resume_path_str)
             if not restored:
                 raise HTTPException(status_code=404, detail="Resume file not found")
 
@@ -481,7 +521,7 @@ async def chat_with_resume(session_id: str, request: ChatRequest):
         client = genai.Client()
         
         # Upload the file to Gemini Files API
-        uploaded_file = client.files.upload(
+        uploaded_file = await client.aio.files.upload(
             file=resume_path,
             config=dict(
                 mime_type='application/pdf',
@@ -500,39 +540,69 @@ async def chat_with_resume(session_id: str, request: ChatRequest):
         If the question is about improvements, provide constructive suggestions.
         Keep your response conversational and helpful."""
         
-        # Generate response
-        response = client.models.generate_content(
-            model=settings.GEMINI_RESUME_MODEL,
-            contents=[uploaded_file, prompt]
-        )
-        
-        # Clean up the uploaded file
-        client.files.delete(name=uploaded_file.name)
+        try:
+            # Generate response
+            response = await asyncio.wait_for(
+                client.aio.models.generate_content(
+                    model=settings.GEMINI_RESUME_MODEL,
+                    contents=[uploaded_file, prompt]
+                ),
+                timeout=CHAT_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"Chat generation timed out for {session_id}")
+            raise HTTPException(status_code=504, detail="Chat response timed out")
+        finally:
+            # Clean up the uploaded file off the response path
+            task = asyncio.create_task(_delete_gemini_file(client, uploaded_file.name))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
         
         return {
             "response": response.text,
             "session_id": session_id
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Chat error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Chat failed: {str(e)}")
 
 
+async def _delete_gemini_file(client: genai.Client, name: str):
+    """Delete a file from the Gemini Files API, logging instead of raising on failure."""
+    try:
+        await client.aio.files.delete(name=name)
+    except Exception as e:
+        logger.warning(f"Failed to delete Gemini file {name}: {e}")
+
+
 @router.get("/file/{session_id}")
-async def get_resume_file(session_id: str):
+async def get_resume_file(session_id: str, request: Request):
     """Serve the resume PDF, downloading from Firebase Storage if the local copy is missing."""
-    resume_path = pathlib.Path(f"uploads/resumes/{session_id}.pdf")
+    resume_path = _session_pdf_path(session_id)
+    resume_path_str = str(resume_path)
 
     if not resume_path.exists():
-        restored = await storage_service.download_resume(session_id, str(resume_path))
+        restored = await storage_service.download_resume(session_id, resume_path_str)
         if not restored:
             raise HTTPException(status_code=404, detail="Resume file not found")
 
+    stat_result = resume_path.stat()
+    etag = f'"{session_id}-{int(stat_result.st_mtime)}"'
+    cache_headers = {"Cache-Control": _PDF_CACHE_CONTROL, "ETag": etag}
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=cache_headers)
+
+    # FileResponse streams via zero-copy sendfile when the server supports it
+    # and answers Range requests, so the PDF viewer can fetch pages lazily.
     return FileResponse(
-        path=str(resume_path),
+        path=resume_path_str,
         media_type="application/pdf",
-        headers={"Content-Disposition": "inline"},
+        stat_result=stat_result,
+        headers={**cache_headers, "Content-Disposition": "inline"},
     )
 
 
@@ -545,6 +615,6 @@ async def health_check():
             "annotation_agent": annotation_agent.processor is not None,
             "feedback_agent": True
         },
-        "upload_dir": str(UPLOAD_DIR),
+        "upload_dir": _UPLOAD_DIR_STR,
         "google_api_key_configured": bool(settings.GOOGLE_API_KEY)
     }
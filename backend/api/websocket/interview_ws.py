@@ -3,13 +3,24 @@ WebSocket handler for live voice interviews.
 Bridges browser audio <-> Gemini Live API via ADK run_live().
 """
 
-import json
 import asyncio
 import logging
+from collections import deque
+from typing import Optional, Union
+
+import msgspec
+import orjson
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
-from models.schemas import InterviewPhase
+from models.schemas import (
+    InterviewPhase,
+    TextInputMsg,
+    WSPhaseMessage,
+    WSMetadataMessage,
+    WSCompleteMessage,
+    WSErrorMessage,
+)
 from services.session_manager import session_manager
 from agents.interview.conductor_agent import create_conductor_agent
 
@@ -23,8 +34,78 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Outbound agent audio is coalesced until either threshold is hit, so many
+# small Gemini PCM fragments go out as fewer WebSocket frames.
+AUDIO_FLUSH_BYTES = 8192
+AUDIO_FLUSH_INTERVAL = 0.010  # seconds
+# Pre-allocated per connection; chunks are copied in place rather than
+# growing a buffer, so each flush is the only allocation.
+AUDIO_BUF_CAPACITY = 65536
+# Upper bound on audio frames waiting for a slow client (~512 KiB at the flush size)
+OUTBOUND_MAX_AUDIO_FRAMES = 64
+
+# One ADK session store for all connections; sessions are deleted on disconnect.
+# Runners stay per-connection because ADK binds a Runner to a single agent.
+_ADK_APP_NAME = "jobless_conductor"
+_adk_session_service = InMemorySessionService()
+
+# Per-connection constants for the live session, built once at import
+_INITIAL_CONTENT = types.Content(
+    role="user",
+    parts=[types.Part.from_text(
+        text="Please begin the interview. Greet the candidate and introduce yourself."
+    )],
+)
+_RUN_CONFIG = RunConfig(
+    response_modalities=["AUDIO"],
+    output_audio_transcription=types.AudioTranscriptionConfig(),
+    input_audio_transcription=types.AudioTranscriptionConfig(),
+)
+
+# Phase names accepted from the signal_phase_change tool
+_PHASE_MAP = {p.value: p for p in InterviewPhase}
+
+# Mic audio format sent by the browser recorder worklet
+_AUDIO_IN_MIME = "audio/pcm"
+
+# Typed, single-pass decoder for JSON text frames from the browser
+_text_msg_decoder = msgspec.json.Decoder(TextInputMsg)
+
+# Shared encoder for server -> client control frames
+_ws_encoder = msgspec.json.Encoder()
+
+# Transcript frames dominate socket traffic and always have the shape of
+# WSTranscriptMessage, so they are assembled from pre-encoded pieces and only
+# the text is JSON-escaped per frame. Roles are fixed literals.
+_TRANSCRIPT_PREFIX = {
+    role: '{"type":"transcript","role":"%s","text":' % role for role in ("agent", "user")
+}
+_TRANSCRIPT_FINAL_SUFFIX = ',"is_final":true}'
+_TRANSCRIPT_PARTIAL_SUFFIX = ',"is_final":false}'
+
+
+def _encode_transcript(role: str, text: str, is_final: bool) -> str:
+    """Encode a transcript frame without building an intermediate dict or struct."""
+    return (
+        _TRANSCRIPT_PREFIX[role]
+        + orjson.dumps(text).decode()
+        + (_TRANSCRIPT_FINAL_SUFFIX if is_final else _TRANSCRIPT_PARTIAL_SUFFIX)
+    )
+
+
+# Control frames that never change, encoded once at import
+_GREETING_PHASE_FRAME = _ws_encoder.encode(WSPhaseMessage(phase=InterviewPhase.GREETING)).decode()
+
 
-def _build_tools(session_id: str):
+def _apply_state_op(session_id: str, op: tuple):
+    """Apply a queued session state mutation."""
+    kind = op[0]
+    if kind == "transcript":
+        _, role, text, question_id = op
+        session_manager.add_transcript_entry(session_id, role=role, text=text, question_id=question_id)
+
+
+def _build_tools(session_id: str, state_q: asyncio.Queue):
     """Build tool functions for the conductor agent, bound to a session."""
 
     def get_next_question() -> dict:
@@ -33,10 +114,11 @@ def _build_tools(session_id: str):
         if question is None:
             return {"has_question": False, "message": "No more questions. Proceed to closing phase."}
 
-        # Record original question for evaluation (with question_id)
-        session_manager.add_transcript_entry(
-            session_id, role="interviewer", text=question.question, question_id=question.id
-        )
+        question_type = question.type.value
+
+        # Record original question for evaluation (with question_id). Goes through
+        # the same queue as candidate turns so transcript order is preserved.
+        state_q.put_nowait(("transcript", "interviewer", question.question, question.id))
 
         session = session_manager.get_session(session_id)
         total = len(session.questions) if session else 0
@@ -47,15 +129,14 @@ def _build_tools(session_id: str):
             "question": question.question,
             "question_number": current,
             "total_questions": total,
-            "question_type": question.type.value,
+            "question_type": question_type,
             "follow_ups": question.follow_ups,
         }
 
     def signal_phase_change(phase: str) -> dict:
         """Signal a phase transition in the interview. Phase must be one of: questions, closing, complete."""
-        try:
-            new_phase = InterviewPhase(phase)
-        except ValueError:
+        new_phase = _PHASE_MAP.get(phase)
+        if new_phase is None:
             return {"success": False, "error": f"Invalid phase: {phase}"}
 
         success = session_manager.update_phase(session_id, new_phase)
@@ -64,9 +145,70 @@ def _build_tools(session_id: str):
     return [get_next_question, signal_phase_change]
 
 
-async def _send_json(ws: WebSocket, data: dict):
-    """Send a JSON message over WebSocket."""
-    await ws.send_text(json.dumps(data))
+def _encode_message(msg: msgspec.Struct) -> str:
+    """Encode a control message as a JSON text frame.
+
+    Always text: the client treats every binary frame as PCM audio.
+    """
+    return _ws_encoder.encode(msg).decode()
+
+
+async def _send_message(ws: WebSocket, msg: msgspec.Struct):
+    """Send a control message over WebSocket as JSON."""
+    await ws.send_text(_encode_message(msg))
+
+
+class _OutboundQueue:
+    """Server -> client frames for one connection, drained by a single sender task.
+
+    bytes frames are audio, str frames are JSON control messages. Audio is
+    capped at max_audio frames and the oldest is dropped when full, so a stalled
+    client cannot grow memory without bound; control frames are never dropped.
+    """
+
+    def __init__(self, max_audio: int):
+        self._frames: deque = deque()
+        self._max_audio = max_audio
+        self._audio_count = 0
+        self._closed = False
+        self._ready = asyncio.Event()
+        self.dropped_audio = 0
+
+    def put_audio(self, data: bytes):
+        if self._audio_count >= self._max_audio:
+            self._drop_oldest_audio()
+        self._frames.append(data)
+        self._audio_count += 1
+        self._ready.set()
+
+    def put_text(self, text: str):
+        self._frames.append(text)
+        self._ready.set()
+
+    def close(self):
+        """Let the sender exit once everything already queued has been sent."""
+        self._closed = True
+        self._ready.set()
+
+    async def get(self) -> Optional[Union[bytes, str]]:
+        """Next frame to send, or None once closed and empty."""
+        while not self._frames:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        frame = self._frames.popleft()
+        if isinstance(frame, bytes):
+            self._audio_count -= 1
+        return frame
+
+    def _drop_oldest_audio(self):
+        for i, frame in enumerate(self._frames):
+            if isinstance(frame, bytes):
+                del self._frames[i]
+                self._audio_count -= 1
+                self.dropped_audio += 1
+                return
 
 
 @router.websocket("/ws/interview/{session_id}")
@@ -87,8 +229,19 @@ async def interview_websocket(ws: WebSocket, session_id: str):
     await ws.accept()
     logger.info(f"WebSocket connected for session {session_id}")
 
+    # Transcript writes are queued and applied off the audio forwarding path
+    state_q: asyncio.Queue = asyncio.Queue()
+
+    # Phase changes are pushed here by session_manager.update_phase instead of
+    # being polled after every Gemini event
+    pending_phase: Optional[InterviewPhase] = None
+
+    def on_phase_change(phase: InterviewPhase):
+        nonlocal pending_phase
+        pending_phase = phase
+
     # Build tools and agent
-    tools = _build_tools(session_id)
+    tools = _build_tools(session_id, state_q)
     agent = create_conductor_agent(
         candidate_name=session.config.candidate_name,
         company=session.config.company,
@@ -99,15 +252,14 @@ async def interview_websocket(ws: WebSocket, session_id: str):
     )
 
     # Create ADK runner
-    adk_session_service = InMemorySessionService()
     runner = Runner(
         agent=agent,
-        app_name="jobless_conductor",
-        session_service=adk_session_service,
+        app_name=_ADK_APP_NAME,
+        session_service=_adk_session_service,
     )
 
-    adk_session = await adk_session_service.create_session(
-        app_name="jobless_conductor",
+    adk_session = await _adk_session_service.create_session(
+        app_name=_ADK_APP_NAME,
         user_id=session_id,
         state={
             "candidate_name": session.config.candidate_name,
@@ -116,51 +268,67 @@ async def interview_websocket(ws: WebSocket, session_id: str):
         },
     )
 
+    # Every server -> client frame goes through this queue and its sender task,
+    # so neither connection setup nor the Gemini stream waits on client writes
+    out_q = _OutboundQueue(OUTBOUND_MAX_AUDIO_FRAMES)
+
     # Send initial phase
-    await _send_json(ws, {"type": "phase", "phase": "greeting"})
-    await _send_json(ws, {
-        "type": "metadata",
-        "question_number": 0,
-        "total_questions": len(session.questions),
-    })
+    out_q.put_text(_GREETING_PHASE_FRAME)
+    out_q.put_text(_encode_message(WSMetadataMessage(
+        question_number=0,
+        total_questions=len(session.questions),
+    )))
 
+    session_manager.register_phase_listener(session_id, on_phase_change)
+    live_queue = LiveRequestQueue()
     try:
-        live_queue = LiveRequestQueue()
-
         # Send initial prompt to trigger the agent's greeting
-        initial_content = types.Content(
-            role="user",
-            parts=[types.Part.from_text(
-                text="Please begin the interview. Greet the candidate and introduce yourself."
-            )],
-        )
-        live_queue.send_content(initial_content)
+        live_queue.send_content(_INITIAL_CONTENT)
 
         # Task: receive audio/text from browser and forward to Gemini
         audio_chunk_count = 0
+        # Per-chunk audio logging is a development aid; decide once per connection
+        log_audio_in = settings.ENVIRONMENT == "development" and logger.isEnabledFor(logging.INFO)
 
         async def forward_client_input():
             nonlocal audio_chunk_count
             try:
                 while True:
+                    # A single reader is required: receive_bytes()/receive_text()
+                    # each consume the next frame and fail on the other type.
                     data = await ws.receive()
-                    if "bytes" in data:
-                        audio_chunk_count += 1
-                        if audio_chunk_count <= 3 or audio_chunk_count % 100 == 0:
-                            logger.info(f"[audio-in] Chunk #{audio_chunk_count}, size={len(data['bytes'])} bytes")
-                        blob = types.Blob(mime_type="audio/pcm", data=data["bytes"])
-                        live_queue.send_realtime(blob)
-                    elif "text" in data:
-                        msg = json.loads(data["text"])
-                        if msg.get("type") == "text_input":
-                            session_manager.add_transcript_entry(
-                                session_id, role="candidate", text=msg["text"]
-                            )
-                            content = types.Content(
-                                role="user",
-                                parts=[types.Part.from_text(text=msg["text"])],
-                            )
-                            live_queue.send_content(content)
+                    chunk = data.get("bytes")
+                    if chunk is not None:
+                        if log_audio_in:
+                            audio_chunk_count += 1
+                            if audio_chunk_count <= 3 or audio_chunk_count % 100 == 0:
+                                logger.info("[audio-in] Chunk #%d, size=%d bytes", audio_chunk_count, len(chunk))
+                        # LiveRequestQueue needs a Blob; the fields are known-good
+                        # (constant mime type, raw frame bytes), so skip validation.
+                        live_queue.send_realtime(
+                            types.Blob.model_construct(mime_type=_AUDIO_IN_MIME, data=chunk)
+                        )
+                        continue
+
+                    text = data.get("text")
+                    if text is None:
+                        if data["type"] == "websocket.disconnect":
+                            raise WebSocketDisconnect(data.get("code", 1000))
+                        continue
+
+                    try:
+                        msg = _text_msg_decoder.decode(text)
+                    except msgspec.DecodeError as e:
+                        logger.warning(f"Ignoring malformed client message: {e}")
+                        continue
+
+                    if msg.type == "text_input":
+                        state_q.put_nowait(("transcript", "candidate", msg.text, None))
+                        content = types.Content(
+                            role="user",
+                            parts=[types.Part.from_text(text=msg.text)],
+                        )
+                        live_queue.send_content(content)
             except WebSocketDisconnect:
                 logger.info(f"Client disconnected from {session_id}")
             except Exception as e:
@@ -169,82 +337,96 @@ async def interview_websocket(ws: WebSocket, session_id: str):
                     logger.debug("Client receive loop ended: %s", e)
                 else:
                     logger.error(f"Error receiving from client: {e}")
-            finally:
-                live_queue.close()
-
-        # Configure live audio streaming with transcription
-        run_config = RunConfig(
-            response_modalities=["AUDIO"],
-            output_audio_transcription=types.AudioTranscriptionConfig(),
-            input_audio_transcription=types.AudioTranscriptionConfig(),
-        )
 
         # Task: receive events from Gemini and forward to browser
         async def forward_agent_responses():
+            nonlocal pending_phase
             # After a final transcription is sent for a role, skip all
             # subsequent events for that role until the OTHER role speaks.
             # This prevents the API's "confirmed" re-send from duplicating.
             output_done = False
             input_done = False
+            # Last (text, is_final) sent per role; partial deltas can repeat verbatim
+            last_out = last_in = None
+            # The greeting phase frame was already sent on connect
+            last_phase = InterviewPhase.GREETING
+
+            loop = asyncio.get_running_loop()
+            audio_buf = memoryview(bytearray(AUDIO_BUF_CAPACITY))
+            audio_len = 0
+            last_flush_ts = loop.time()
+
+            def flush_audio():
+                nonlocal audio_len, last_flush_ts
+                if audio_len:
+                    out_q.put_audio(bytes(audio_buf[:audio_len]))
+                    audio_len = 0
+                last_flush_ts = loop.time()
 
             try:
                 async for event in runner.run_live(
                     session_id=adk_session.id,
                     user_id=session_id,
                     live_request_queue=live_queue,
-                    run_config=run_config,
+                    run_config=_RUN_CONFIG,
                 ):
                     # --- Audio chunks (agent speaking) ---
                     if event.content and event.content.parts:
                         for part in event.content.parts:
                             if part.inline_data and part.inline_data.data:
-                                await ws.send_bytes(part.inline_data.data)
+                                chunk = part.inline_data.data
+                                n = len(chunk)
+                                if audio_len + n > AUDIO_BUF_CAPACITY:
+                                    flush_audio()
+                                    if n > AUDIO_BUF_CAPACITY:
+                                        out_q.put_audio(chunk)
+                                        continue
+                                audio_buf[audio_len:audio_len + n] = chunk
+                                audio_len += n
+                                if (
+                                    audio_len >= AUDIO_FLUSH_BYTES
+                                    or loop.time() - last_flush_ts >= AUDIO_FLUSH_INTERVAL
+                                ):
+                                    flush_audio()
+
+                    # Don't hold the tail of an utterance waiting for more audio
+                    if event.turn_complete or event.interrupted:
+                        flush_audio()
 
                     # --- Agent speech transcription ---
                     if event.output_transcription and event.output_transcription.text:
-                        if not output_done:
-                            text = event.output_transcription.text
-                            is_final = bool(event.output_transcription.finished)
-                            await _send_json(ws, {
-                                "type": "transcript",
-                                "role": "agent",
-                                "text": text,
-                                "is_final": is_final,
-                            })
+                        text = event.output_transcription.text
+                        is_final = bool(event.output_transcription.finished)
+                        if not output_done and (text, is_final) != last_out:
+                            last_out = (text, is_final)
+                            flush_audio()
+                            out_q.put_text(_encode_transcript("agent", text, is_final))
                             if is_final:
                                 output_done = True
                                 input_done = False  # new turn: user can speak next
+                                last_in = None
 
                     # --- User speech transcription ---
                     if event.input_transcription and event.input_transcription.text:
-                        if not input_done:
-                            text = event.input_transcription.text
-                            is_final = bool(event.input_transcription.finished)
-                            await _send_json(ws, {
-                                "type": "transcript",
-                                "role": "user",
-                                "text": text,
-                                "is_final": is_final,
-                            })
+                        text = event.input_transcription.text
+                        is_final = bool(event.input_transcription.finished)
+                        if not input_done and (text, is_final) != last_in:
+                            last_in = (text, is_final)
+                            flush_audio()
+                            out_q.put_text(_encode_transcript("user", text, is_final))
                             if is_final:
                                 input_done = True
                                 output_done = False  # new turn: agent can speak next
-                                session_manager.add_transcript_entry(
-                                    session_id, role="candidate", text=text,
-                                )
-
-                    # Check if phase changed
-                    current_session = session_manager.get_session(session_id)
-                    if current_session:
-                        await _send_json(ws, {
-                            "type": "phase",
-                            "phase": current_session.phase.value,
-                        })
-                        if current_session.phase == InterviewPhase.COMPLETE:
-                            await _send_json(ws, {
-                                "type": "interview_complete",
-                                "session_id": session_id,
-                            })
+                                last_out = None
+                                state_q.put_nowait(("transcript", "candidate", text, None))
+
+                    # Forward a phase change signalled by a tool call
+                    if pending_phase is not None and pending_phase != last_phase:
+                        last_phase, pending_phase = pending_phase, None
+                        flush_audio()
+                        out_q.put_text(_encode_message(WSPhaseMessage(phase=last_phase)))
+                        if last_phase == InterviewPhase.COMPLETE:
+                            out_q.put_text(_encode_message(WSCompleteMessage(session_id=session_id)))
                             return
 
             except Exception as e:
@@ -255,31 +437,75 @@ async def interview_websocket(ws: WebSocket, session_id: str):
                     logger.warning("Gemini Live connection closed (1011 internal error)")
                 else:
                     logger.error(f"Error streaming agent responses: {e}")
-                try:
-                    if "1000" not in err_msg:
-                        await _send_json(ws, {
-                            "type": "error",
-                            "message": "Voice connection was interrupted. Please start a new interview.",
-                        })
-                except Exception:
-                    pass
-
-        # Run both tasks concurrently
-        await asyncio.gather(
-            forward_client_input(),
-            forward_agent_responses(),
-            return_exceptions=True,
-        )
+                if "1000" not in err_msg:
+                    out_q.put_text(_encode_message(WSErrorMessage(
+                        message="Voice connection was interrupted. Please start a new interview.",
+                    )))
+            finally:
+                flush_audio()
+                out_q.close()
+
+        # Task: send queued frames to the browser, so a slow client never
+        # stalls the Gemini stream and memory stays bounded
+        async def send_outbound():
+            try:
+                while (frame := await out_q.get()) is not None:
+                    if isinstance(frame, bytes):
+                        await ws.send_bytes(frame)
+                    else:
+                        await ws.send_text(frame)
+            except Exception as e:
+                logger.debug("Outbound sender stopped: %s", e)
+            finally:
+                if out_q.dropped_audio:
+                    logger.warning(
+                        f"Dropped {out_q.dropped_audio} audio frames for slow client {session_id}"
+                    )
+
+        # Task: apply queued session state mutations in order
+        async def drain_state():
+            while True:
+                op = await state_q.get()
+                _apply_state_op(session_id, op)
+
+        drain_task = asyncio.create_task(drain_state())
+        try:
+            # Run both tasks concurrently. Once the client is gone there is no one
+            # to stream to, so stop pulling Gemini events right away.
+            async with asyncio.TaskGroup() as tg:
+                client_task = tg.create_task(forward_client_input())
+                agent_task = tg.create_task(forward_agent_responses())
+                sender_task = tg.create_task(send_outbound())
+
+                def on_client_done(_):
+                    agent_task.cancel()
+                    sender_task.cancel()
+
+                client_task.add_done_callback(on_client_done)
+        except* Exception as eg:
+            for exc in eg.exceptions:
+                logger.error(f"Interview task failed for {session_id}: {exc}")
+        finally:
+            drain_task.cancel()
+            while not state_q.empty():
+                _apply_state_op(session_id, state_q.get_nowait())
 
     except Exception as e:
         logger.error(f"Live mode failed for {session_id}: {e}", exc_info=True)
         try:
-            await _send_json(ws, {
-                "type": "error",
-                "message": f"Voice connection failed: {str(e)}. Please try again.",
-            })
+            await _send_message(ws, WSErrorMessage(
+                message=f"Voice connection failed: {str(e)}. Please try again.",
+            ))
         except Exception:
             pass
 
     finally:
+        live_queue.close()
+        session_manager.unregister_phase_listener(session_id, on_phase_change)
+        try:
+            await _adk_session_service.delete_session(
+                app_name=_ADK_APP_NAME, user_id=session_id, session_id=adk_session.id,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to delete ADK session for {session_id}: {e}")
         logger.info(f"WebSocket closed for session {session_id}")
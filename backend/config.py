@@ -48,6 +48,9 @@ class Settings(BaseSettings):
     DEFAULT_QUESTION_COUNT: int = 5
     MAX_QUESTION_COUNT: int = 10
     EVALUATION_TIMEOUT: int = 120  # seconds
+    # How long session creation waits on JD question generation before using the
+    # static bank; slower generations still finish in the background and warm the JD cache
+    JD_GENERATION_TIMEOUT: float = 8.0  # seconds
 
     # Agent Settings
     AGENT_MAX_RETRIES: int = 2
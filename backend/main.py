@@ -5,8 +5,9 @@ Main FastAPI application entry point.
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import logging
+import orjson
 from contextlib import asynccontextmanager
 
 import os
@@ -47,6 +48,9 @@ async def lifespan(app: FastAPI):
 
     logger.info("Shutting down JobBless backend...")
 
+    # Commit any Firestore writes still waiting in the batch buffer
+    await firestore_service.flush()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -64,18 +68,23 @@ app.add_middleware(
 )
 
 
+# Static bodies for the probe endpoints, encoded once instead of per request
+_ROOT_BODY = orjson.dumps({
+    "app": settings.APP_NAME,
+    "version": "1.0.0",
+    "status": "running",
+})
+_HEALTH_BODY = orjson.dumps({"status": "healthy", "service": settings.APP_NAME})
+
+
 @app.get("/")
 async def root():
-    return {
-        "app": settings.APP_NAME,
-        "version": "1.0.0",
-        "status": "running",
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": settings.APP_NAME}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 @app.exception_handler(Exception)
@@ -105,10 +114,18 @@ app.include_router(ws_router, tags=["websocket"])
 if __name__ == "__main__":
     import uvicorn
 
+    # uvloop cuts per-callback overhead on the WebSocket audio path (Linux/macOS only)
+    try:
+        import uvloop  # noqa: F401
+        loop_impl = "uvloop"
+    except ImportError:
+        loop_impl = "asyncio"
+
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=settings.PORT,
         reload=settings.ENVIRONMENT == "development",
         log_level=settings.LOG_LEVEL.lower(),
+        loop=loop_impl,
     )
@@ -1,12 +1,16 @@
 """
 Pydantic models for JobBless.
 Used for API validation, agent structured output, and session state.
+WebSocket hot-path messages use msgspec structs instead.
 """
 
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from enum import Enum
 
+import msgspec
+import ormsgpack
+
 
 # ============================================
 # Enums
@@ -42,6 +46,8 @@ class QuestionType(str, Enum):
 
 class Question(BaseModel):
     """A single interview question from the question bank."""
+    model_config = ConfigDict(frozen=True)
+
     id: str
     company: str
     position: str
@@ -53,6 +59,10 @@ class Question(BaseModel):
     tags: List[str] = Field(default_factory=list)
 
 
+# Validates a whole list of question dicts in one pydantic-core call
+QuestionListAdapter = TypeAdapter(List[Question])
+
+
 # ============================================
 # Session Models
 # ============================================
@@ -89,6 +99,14 @@ class InterviewSession(BaseModel):
     created_at: Optional[float] = None
     completed_at: Optional[float] = None
 
+    def to_msgpack(self) -> bytes:
+        """Compact snapshot of the full session for persistence."""
+        return ormsgpack.packb(self.model_dump(mode="json"))
+
+    @classmethod
+    def from_msgpack(cls, blob: bytes) -> "InterviewSession":
+        return cls.model_validate(ormsgpack.unpackb(blob))
+
 
 # ============================================
 # Agent Output: Evaluator
@@ -96,12 +114,16 @@ class InterviewSession(BaseModel):
 
 class AnswerScore(BaseModel):
     """Score for a single answer dimension."""
+    model_config = ConfigDict(frozen=True)
+
     score: int = Field(ge=1, le=10, description="Score from 1-10")
     justification: str = Field(description="Brief justification for the score")
 
 
 class QuestionEvaluation(BaseModel):
     """Evaluation of a single question-answer pair."""
+    model_config = ConfigDict(frozen=True)
+
     question_id: str
     question_text: str
     answer_summary: str = Field(description="Brief summary of what the candidate said")
@@ -194,27 +216,40 @@ class EvaluateResponse(BaseModel):
 
 
 # ============================================
-# WebSocket Message Models
+# WebSocket Message Models (msgspec)
 # ============================================
+# Server -> client control frames. These are built for every transcript delta,
+# so they are msgspec structs rather than Pydantic models. The "type" field is
+# emitted as the struct tag.
 
-class WSTranscriptMessage(BaseModel):
-    type: str = "transcript"
+class WSTranscriptMessage(msgspec.Struct, tag_field="type", tag="transcript"):
     role: str  # "user" or "agent"
     text: str
     is_final: bool = False
 
 
-class WSPhaseMessage(BaseModel):
-    type: str = "phase"
+class WSPhaseMessage(msgspec.Struct, tag_field="type", tag="phase"):
     phase: InterviewPhase
 
 
-class WSMetadataMessage(BaseModel):
-    type: str = "metadata"
+class WSMetadataMessage(msgspec.Struct, tag_field="type", tag="metadata"):
     question_number: int
     total_questions: int
 
 
-class WSCompleteMessage(BaseModel):
-    type: str = "interview_complete"
+class WSCompleteMessage(msgspec.Struct, tag_field="type", tag="interview_complete"):
     session_id: str
+
+
+class WSErrorMessage(msgspec.Struct, tag_field="type", tag="error"):
+    message: str
+
+
+# ============================================
+# WebSocket Client Messages (msgspec)
+# ============================================
+
+class TextInputMsg(msgspec.Struct):
+    """JSON control message sent by the browser (text_input, end_of_turn, ...)."""
+    type: str
+    text: str = ""
@@ -89,6 +89,7 @@ async def run_evaluation(session_id: str) -> Dict[str, Any]:
         await firestore_service.update_session_field(
             session_id, "status", InterviewStatus.EVALUATED.value
         )
+        await firestore_service.flush(session_id)
 
         return feedback_result
 
@@ -3,18 +3,37 @@ Firestore Service - Persists interview sessions and feedback.
 Optional: falls back gracefully if Firebase is not configured.
 """
 
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
 logger = logging.getLogger(__name__)
 
 # Firebase is optional - will be None if not configured
 _db = None
+# Collection references, created once alongside _db
+_sessions_col = None
+_feedback_col = None
+_resume_sessions_col = None
+
+# Session/feedback writes are buffered and committed together as WriteBatches
+# (one RPC per batch) shortly after the first one is queued, off the event loop.
+MAX_BATCH_OPS = 40
+FLUSH_DELAY = 0.05  # seconds
+_pending_writes: List[Tuple[str, Any, dict]] = []  # (op, doc_ref, data)
+_flush_task: Optional[asyncio.Task] = None
+_flush_lock = asyncio.Lock()  # batches must commit in queue order
+
+# Field updates are coalesced per session for UPDATE_DEBOUNCE seconds and then
+# released into the write buffer as a single update.
+UPDATE_DEBOUNCE = 0.25  # seconds
+_pending_updates: Dict[str, Dict[str, Any]] = {}
+_pending_timers: Dict[str, asyncio.TimerHandle] = {}
 
 
 def init_firestore(credentials_path: str = "", storage_bucket: str = ""):
     """Initialize Firestore (and optionally Firebase Storage). Safe to call without credentials."""
-    global _db
+    global _db, _sessions_col, _feedback_col, _resume_sessions_col
     if not credentials_path:
         logger.info("Firestore credentials not configured, using in-memory only")
         return
@@ -29,6 +48,9 @@ def init_firestore(credentials_path: str = "", storage_bucket: str = ""):
             firebase_admin.initialize_app(cred, options)
 
         _db = firestore.client()
+        _sessions_col = _db.collection("sessions")
+        _feedback_col = _db.collection("feedback")
+        _resume_sessions_col = _db.collection("resume_sessions")
         logger.info("Firestore initialized successfully")
         if storage_bucket:
             logger.info(f"Firebase Storage bucket: {storage_bucket}")
@@ -37,12 +59,77 @@ def init_firestore(credentials_path: str = "", storage_bucket: str = ""):
         _db = None
 
 
+def _queue_write(op: str, doc_ref, data: dict):
+    """Buffer a set/update and make sure a flush is scheduled."""
+    global _flush_task
+    _pending_writes.append((op, doc_ref, data))
+    if _flush_task is None or _flush_task.done():
+        _flush_task = asyncio.get_running_loop().create_task(_flush_soon())
+
+
+async def _flush_soon():
+    await asyncio.sleep(FLUSH_DELAY)
+    await _commit_pending()
+
+
+def _commit(ops: List[Tuple[str, Any, dict]]):
+    """Commit ops as one batch; if the batch is rejected, retry them one by one
+    so a single bad write (e.g. update on a missing doc) doesn't drop the rest."""
+    batch = _db.batch()
+    for op, doc_ref, data in ops:
+        getattr(batch, op)(doc_ref, data)
+    try:
+        batch.commit()
+        return
+    except Exception as e:
+        logger.warning(f"Batched commit of {len(ops)} writes failed, retrying individually: {e}")
+    for op, doc_ref, data in ops:
+        try:
+            getattr(doc_ref, op)(data)
+        except Exception as e:
+            logger.error(f"Failed to {op} {doc_ref.path}: {e}")
+
+
+def _release_updates(session_id: str):
+    """Move a session's coalesced field updates into the write buffer."""
+    timer = _pending_timers.pop(session_id, None)
+    if timer:
+        timer.cancel()
+    fields = _pending_updates.pop(session_id, None)
+    if not fields:
+        return
+    try:
+        # Deferred values are computed once here, after coalescing
+        fields = {k: v() if callable(v) else v for k, v in fields.items()}
+    except Exception as e:
+        logger.error(f"Failed to build update for session {session_id}: {e}")
+        return
+    _queue_write("update", _sessions_col.document(session_id), fields)
+
+
+async def _commit_pending():
+    """Commit everything in the write buffer; debounced field updates stay pending."""
+    async with _flush_lock:
+        while _pending_writes:
+            ops = _pending_writes[:MAX_BATCH_OPS]
+            del _pending_writes[:MAX_BATCH_OPS]
+            await asyncio.to_thread(_commit, ops)
+
+
+async def flush(session_id: Optional[str] = None):
+    """Release pending field updates for session_id (or for every session if
+    None) and commit all buffered writes. Safe to call without Firestore configured."""
+    for sid in [session_id] if session_id else list(_pending_updates):
+        _release_updates(sid)
+    await _commit_pending()
+
+
 async def save_session(session_id: str, data: dict) -> bool:
-    """Save session data to Firestore."""
+    """Queue session data to be saved to Firestore."""
     if not _db:
         return False
     try:
-        _db.collection("sessions").document(session_id).set(data)
+        _queue_write("set", _sessions_col.document(session_id), data)
         return True
     except Exception as e:
         logger.error(f"Failed to save session {session_id}: {e}")
@@ -54,7 +141,7 @@ async def get_session(session_id: str) -> Optional[dict]:
     if not _db:
         return None
     try:
-        doc = _db.collection("sessions").document(session_id).get()
+        doc = _sessions_col.document(session_id).get()
         return doc.to_dict() if doc.exists else None
     except Exception as e:
         logger.error(f"Failed to get session {session_id}: {e}")
@@ -62,11 +149,11 @@ async def get_session(session_id: str) -> Optional[dict]:
 
 
 async def save_feedback(session_id: str, feedback: dict) -> bool:
-    """Save feedback report to Firestore."""
+    """Queue a feedback report to be saved to Firestore."""
     if not _db:
         return False
     try:
-        _db.collection("feedback").document(session_id).set(feedback)
+        _queue_write("set", _feedback_col.document(session_id), feedback)
         return True
     except Exception as e:
         logger.error(f"Failed to save feedback {session_id}: {e}")
@@ -78,31 +165,43 @@ async def get_feedback(session_id: str) -> Optional[dict]:
     if not _db:
         return None
     try:
-        doc = _db.collection("feedback").document(session_id).get()
+        doc = _feedback_col.document(session_id).get()
         return doc.to_dict() if doc.exists else None
     except Exception as e:
         logger.error(f"Failed to get feedback {session_id}: {e}")
         return None
 
 
-async def update_session_field(session_id: str, field: str, value: Any) -> bool:
-    """Update a single field on a session document."""
+def queue_session_update(session_id: str, fields: Dict[str, Any]) -> bool:
+    """Queue field updates on a session document, coalesced with other
+    updates to the same session within UPDATE_DEBOUNCE. Must run on the event loop.
+    A callable value is deferred: it is called when the update is released."""
     if not _db:
         return False
     try:
-        _db.collection("sessions").document(session_id).update({field: value})
+        loop = asyncio.get_running_loop()
+        _pending_updates.setdefault(session_id, {}).update(fields)
+        if session_id not in _pending_timers:
+            _pending_timers[session_id] = loop.call_later(
+                UPDATE_DEBOUNCE, _release_updates, session_id
+            )
         return True
     except Exception as e:
-        logger.error(f"Failed to update session {session_id}.{field}: {e}")
+        logger.error(f"Failed to update session {session_id} fields {list(fields)}: {e}")
         return False
 
 
+async def update_session_field(session_id: str, field: str, value: Any) -> bool:
+    """Queue an update of a single field on a session document."""
+    return queue_session_update(session_id, {field: value})
+
+
 async def save_resume_analysis(session_id: str, data: dict) -> bool:
     """Save resume analysis to Firestore."""
     if not _db:
         return False
     try:
-        _db.collection("resume_sessions").document(session_id).set(data)
+        _resume_sessions_col.document(session_id).set(data)
         return True
     except Exception as e:
         logger.error(f"Failed to save resume analysis {session_id}: {e}")
@@ -114,7 +213,7 @@ async def get_resume_analysis(session_id: str) -> Optional[dict]:
     if not _db:
         return None
     try:
-        doc = _db.collection("resume_sessions").document(session_id).get()
+        doc = _resume_sessions_col.document(session_id).get()
         return doc.to_dict() if doc.exists else None
     except Exception as e:
         logger.error(f"Failed to get resume analysis {session_id}: {e}")
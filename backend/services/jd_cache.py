@@ -0,0 +1,193 @@
+"""
+Semantic cache for JD-generated interview questions.
+Near-duplicate job descriptions (same company/position/type mix/count and an
+embedding cosine similarity above SIMILARITY_THRESHOLD) reuse previously
+generated questions instead of making another Gemini generation call.
+
+Embeddings are stored int8-quantized with a per-row scale, a quarter of the
+float32 size on disk and in memory. Lookups widen the rows to int32 in bounded
+chunks (LOOKUP_CHUNK_ROWS) so no full-size temporary copy is made.
+Persisted as a JSONL file of entries plus .npy files for the matrix and scales.
+Every file is rewritten via tmp + os.replace in a worker thread; if they are
+found out of step on load (crash mid-save, old format) they are all discarded.
+"""
+
+import asyncio
+import os
+import logging
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import orjson
+from google import genai
+
+from models.schemas import Question, QuestionType
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "text-embedding-004"
+SIMILARITY_THRESHOLD = 0.92
+LOOKUP_CHUNK_ROWS = 1024
+
+
+def cache_key(
+    company: str,
+    position: str,
+    question_types: List[QuestionType],
+    count: int,
+) -> str:
+    """Exact-match part of the lookup; only entries with the same key are compared."""
+    types_part = ",".join(sorted(qt.value for qt in question_types))
+    return f"{company.lower()}|{position.lower()}|{types_part}|{count}"
+
+
+async def embed_job_description(client: genai.Client, job_description: str) -> np.ndarray:
+    """Embed a JD with the Gemini embedding API and L2-normalize it."""
+    response = await client.aio.models.embed_content(
+        model=EMBEDDING_MODEL,
+        contents=job_description[:5000],
+    )
+    vec = np.asarray(response.embeddings[0].values, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def quantize(vec: np.ndarray) -> Tuple[np.ndarray, np.float16]:
+    """Symmetric int8 quantization with scale max(|v|)/127."""
+    peak = float(np.abs(vec).max()) if vec.size else 0.0
+    scale = peak / 127 if peak else 1.0
+    q = np.round(vec / scale).astype(np.int8)
+    return q, np.float16(scale)
+
+
+class JDQuestionCache:
+    def __init__(self):
+        self.entries_file = Path("data/jd_cache.jsonl")
+        self.embeddings_file = Path("data/jd_cache_embeddings.npy")
+        self.scales_file = Path("data/jd_cache_scales.npy")
+        self.entries: List[Dict[str, Any]] = []
+        # int8 rows and their float16 dequantization scales
+        self.embeddings: Optional[np.ndarray] = None
+        self.scales = np.empty(0, dtype=np.float16)
+        # Row-aligned integer code per entry key, so key filtering is a vector compare
+        self._key_codes: Dict[str, int] = {}
+        self._row_codes = np.empty(0, dtype=np.int32)
+        # Serializes disk writes only; lookups use the in-memory state
+        self._write_lock = asyncio.Lock()
+        self._load()
+
+    def _code_for(self, key: str) -> int:
+        return self._key_codes.setdefault(key, len(self._key_codes))
+
+    @property
+    def _files(self) -> Tuple[Path, Path, Path]:
+        return self.entries_file, self.embeddings_file, self.scales_file
+
+    def _discard_files(self):
+        """Remove all cache files so the next save starts from a consistent state."""
+        for path in self._files:
+            try:
+                path.unlink(missing_ok=True)
+            except Exception as e:
+                logger.error(f"Failed to remove {path}: {e}")
+
+    def _load(self):
+        existing = [f.exists() for f in self._files]
+        if not any(existing):
+            return
+        if not all(existing):
+            logger.warning("JD cache files incomplete, discarding them")
+            self._discard_files()
+            return
+        try:
+            with open(self.entries_file, "rb") as f:
+                entries = [orjson.loads(line) for line in f if line.strip()]
+            # Memory-map the matrix so it is paged in from disk instead of copied
+            embeddings = np.load(self.embeddings_file, mmap_mode="r")
+            scales = np.load(self.scales_file)
+            if embeddings.dtype != np.int8 or not (len(entries) == embeddings.shape[0] == scales.shape[0]):
+                logger.warning("JD cache entries and embeddings are out of sync, discarding them")
+                self._discard_files()
+                return
+            self.entries = entries
+            self.embeddings = embeddings
+            self.scales = scales
+            self._row_codes = np.fromiter(
+                (self._code_for(entry["key"]) for entry in entries),
+                dtype=np.int32,
+                count=len(entries),
+            )
+            logger.info(f"Loaded JD question cache with {len(self.entries)} entries")
+        except Exception as e:
+            logger.error(f"Failed to load JD cache: {e}")
+            self.entries = []
+            self.embeddings = None
+            self.scales = np.empty(0, dtype=np.float16)
+            self._key_codes = {}
+            self._row_codes = np.empty(0, dtype=np.int32)
+            self._discard_files()
+
+    def _save(self, entries: List[Dict[str, Any]], embeddings: np.ndarray, scales: np.ndarray):
+        """Write a snapshot of the cache; each file is replaced atomically."""
+        try:
+            self.entries_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_entries = self.entries_file.with_suffix(".jsonl.tmp")
+            with open(tmp_entries, "wb") as f:
+                for entry in entries:
+                    f.write(orjson.dumps(entry) + b"\n")
+            tmp_embeddings = self.embeddings_file.with_suffix(".tmp.npy")
+            np.save(tmp_embeddings, embeddings)
+            tmp_scales = self.scales_file.with_suffix(".tmp.npy")
+            np.save(tmp_scales, scales)
+            os.replace(tmp_embeddings, self.embeddings_file)
+            os.replace(tmp_scales, self.scales_file)
+            os.replace(tmp_entries, self.entries_file)
+        except Exception as e:
+            logger.error(f"Failed to save JD cache: {e}")
+
+    def lookup(self, key: str, embedding: np.ndarray) -> Optional[Tuple[List[Question], str]]:
+        """Return fresh copies of cached questions for the closest matching JD, if close enough."""
+        code = self._key_codes.get(key)
+        if self.embeddings is None or code is None:
+            return None
+        q_query, query_scale = quantize(embedding)
+        q_query = q_query.astype(np.int32)  # int8 products would overflow
+        dots = np.empty(self.embeddings.shape[0], dtype=np.int32)
+        for start in range(0, len(dots), LOOKUP_CHUNK_ROWS):
+            rows = self.embeddings[start:start + LOOKUP_CHUNK_ROWS]
+            dots[start:start + len(rows)] = rows.astype(np.int32) @ q_query
+        scores = dots * (self.scales.astype(np.float32) * np.float32(query_scale))
+        scores[self._row_codes != code] = -np.inf
+        best = int(scores.argmax())
+        if scores[best] <= SIMILARITY_THRESHOLD:
+            return None
+
+        entry = self.entries[best]
+        logger.info(f"JD cache hit for {key} (similarity {scores[best]:.3f})")
+        questions = [
+            Question(**{**q, "id": f"jd-{uuid.uuid4().hex[:8]}"})
+            for q in entry["questions"]
+        ]
+        return questions, entry["jd_summary"]
+
+    async def add(self, key: str, embedding: np.ndarray, questions: List[Question], jd_summary: str):
+        self.entries.append({
+            "key": key,
+            "questions": [q.model_dump(mode="json") for q in questions],
+            "jd_summary": jd_summary,
+        })
+        q, scale = quantize(embedding)
+        row = q[np.newaxis, :]
+        self.embeddings = row if self.embeddings is None else np.concatenate([self.embeddings, row])
+        self.scales = np.append(self.scales, scale)
+        self._row_codes = np.append(self._row_codes, np.int32(self._code_for(key)))
+        # add() only ever rebinds these, so the snapshot is safe to hand to a thread
+        entries, embeddings, scales = list(self.entries), self.embeddings, self.scales
+        async with self._write_lock:
+            await asyncio.to_thread(self._save, entries, embeddings, scales)
+
+
+# Singleton
+jd_cache = JDQuestionCache()
@@ -3,18 +3,29 @@ JD Question Generator - Generates tailored interview questions from a job descri
 Uses google.genai.Client directly (not ADK) for a single fast call.
 """
 
-import json
 import logging
 import uuid
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
+import orjson
 from google import genai
 from google.genai import types
 
-from models.schemas import Question, QuestionType
+from models.schemas import Question, QuestionListAdapter, QuestionType
+from services.jd_cache import cache_key, embed_job_description, jd_cache
 
 logger = logging.getLogger(__name__)
 
+# Shared client so its HTTP connection pool is reused across sessions
+_client: Optional[genai.Client] = None
+
+_FENCE = b"```"
+_WHITESPACE = b" \t\r\n"
+
+# Model-supplied type strings map straight to enum members; unknown ones default
+_STR_TO_TYPE = {qt.value: qt for qt in QuestionType}
+_DEFAULT_TYPE = QuestionType.BEHAVIORAL
+
 GENERATION_PROMPT = """You are an expert interview question designer. Given a job description, generate {count} interview questions tailored to the specific role, responsibilities, and requirements mentioned.
 
 ## Job Description:
@@ -52,6 +63,28 @@ Return a JSON object with exactly this structure:
 Return ONLY the JSON object, no markdown fences or extra text."""
 
 
+def _get_client() -> genai.Client:
+    global _client
+    if _client is None:
+        _client = genai.Client()
+    return _client
+
+
+def _strip_fences(buf: bytearray) -> memoryview:
+    """View of buf with surrounding whitespace and markdown code fences removed."""
+    start, end = 0, len(buf)
+    while start < end and buf[start] in _WHITESPACE:
+        start += 1
+    if buf.startswith(_FENCE, start):
+        newline = buf.find(b"\n", start)
+        start = end if newline == -1 else newline + 1
+    while end > start and buf[end - 1] in _WHITESPACE:
+        end -= 1
+    if buf.endswith(_FENCE, start, end):
+        end -= len(_FENCE)
+    return memoryview(buf)[start:end]
+
+
 async def generate_questions_from_jd(
     job_description: str,
     company: str,
@@ -75,6 +108,20 @@ async def generate_questions_from_jd(
     Raises:
         Exception on generation failure (caller should fall back to static bank)
     """
+    client = _get_client()
+
+    # Reuse questions generated for a near-identical JD when we have them
+    key = cache_key(company, position, question_types, count)
+    try:
+        embedding = await embed_job_description(client, job_description)
+    except Exception as e:
+        logger.warning(f"JD embedding failed, skipping semantic cache: {e}")
+        embedding = None
+    if embedding is not None:
+        cached = jd_cache.lookup(key, embedding)
+        if cached:
+            return cached
+
     type_names = ", ".join(qt.value for qt in question_types)
 
     prompt = GENERATION_PROMPT.format(
@@ -85,8 +132,9 @@ async def generate_questions_from_jd(
         question_types=type_names,
     )
 
-    client = genai.Client()
-    response = await client.aio.models.generate_content(
+    # Stream the response so the event loop gets control back between chunks
+    buf = bytearray()
+    stream = await client.aio.models.generate_content_stream(
         model="gemini-2.5-flash",
         contents=prompt,
         config=types.GenerateContentConfig(
@@ -94,40 +142,31 @@ async def generate_questions_from_jd(
             max_output_tokens=2000,
         ),
     )
+    async for chunk in stream:
+        if chunk.text:
+            buf += chunk.text.encode()
 
-    raw_text = response.text.strip()
-    # Strip markdown fences if present
-    if raw_text.startswith("```"):
-        raw_text = raw_text[raw_text.index("\n") + 1 :]
-        if raw_text.endswith("```"):
-            raw_text = raw_text[:-3].strip()
-
-    parsed = json.loads(raw_text)
+    parsed = orjson.loads(_strip_fences(buf))
 
     jd_summary = parsed.get("jd_summary", "")
     raw_questions = parsed.get("questions", [])
 
-    questions: List[Question] = []
-    for i, q in enumerate(raw_questions[:count]):
-        # Validate question type
-        try:
-            q_type = QuestionType(q.get("type", "behavioral"))
-        except ValueError:
-            q_type = QuestionType.BEHAVIORAL
-
-        questions.append(
-            Question(
-                id=f"jd-{uuid.uuid4().hex[:8]}",
-                company=q.get("company", company),
-                position=q.get("position", position),
-                type=q_type,
-                difficulty=q.get("difficulty", "medium"),
-                question=q["question"],
-                follow_ups=q.get("follow_ups", []),
-                evaluation_criteria=q.get("evaluation_criteria", []),
-                tags=q.get("tags", []),
-            )
-        )
+    questions: List[Question] = QuestionListAdapter.validate_python([
+        {
+            "id": f"jd-{uuid.uuid4().hex[:8]}",
+            "company": q.get("company", company),
+            "position": q.get("position", position),
+            "type": _STR_TO_TYPE.get(q.get("type"), _DEFAULT_TYPE),
+            "difficulty": q.get("difficulty", "medium"),
+            "question": q["question"],
+            "follow_ups": q.get("follow_ups", []),
+            "evaluation_criteria": q.get("evaluation_criteria", []),
+            "tags": q.get("tags", []),
+        }
+        for q in raw_questions[:count]
+    ])
 
     logger.info(f"Generated {len(questions)} JD-tailored questions for {company}/{position}")
+    if embedding is not None and questions:
+        await jd_cache.add(key, embedding, questions, jd_summary)
     return questions, jd_summary
@@ -3,19 +3,28 @@ QuestionBank - Loads and filters interview questions from JSON.
 Pure Python utility class, not an LLM agent.
 """
 
-import json
-import random
 import logging
+import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Set
 
-from models.schemas import Question, QuestionType
+import numpy as np
+import orjson
+
+from models.schemas import Question, QuestionListAdapter, QuestionType
 
 logger = logging.getLogger(__name__)
 
 DATA_PATH = Path(__file__).parent.parent / "data" / "questions.json"
 
 
+@lru_cache(maxsize=1024)
+def _norm(value: str) -> str:
+    """Lowercased, interned index key; repeat lookups for the same name skip the lower()."""
+    return sys.intern(value.lower())
+
+
 class QuestionBank:
     """Loads questions.json and provides filtering/selection methods."""
 
@@ -23,13 +32,56 @@ class QuestionBank:
         self.questions: List[Question] = []
         self._companies: List[str] = []
         self._positions: List[str] = []
+        # One generator per process instead of the shared global random state
+        self._rng = np.random.default_rng()
+        self._build_indexes()
+
+    def _build_indexes(self):
+        """Build packed uint64 bitmaps (bit i = self.questions[i]) per lowercased
+        company/position and per type, so filtering is a few vector ANDs."""
+        n = len(self.questions)
+        self._n_words = -(-n // 64)
+        self._all_mask = self._pack(np.ones(n, dtype=bool))
+        self._empty_mask = np.zeros(self._n_words, dtype=np.uint64)
+
+        company_rows: Dict[str, List[int]] = {}
+        position_rows: Dict[str, List[int]] = {}
+        type_rows: Dict[QuestionType, List[int]] = {}
+        positions_by_company: Dict[str, Set[str]] = {}
+        for i, q in enumerate(self.questions):
+            company_key = _norm(q.company)
+            company_rows.setdefault(company_key, []).append(i)
+            position_rows.setdefault(_norm(q.position), []).append(i)
+            type_rows.setdefault(q.type, []).append(i)
+            positions_by_company.setdefault(company_key, set()).add(q.position)
+
+        self._mask_company = {k: self._rows_mask(rows) for k, rows in company_rows.items()}
+        self._mask_position = {k: self._rows_mask(rows) for k, rows in position_rows.items()}
+        self._mask_type = {k: self._rows_mask(rows) for k, rows in type_rows.items()}
+        self._positions_by_company: Dict[str, List[str]] = {
+            company: sorted(positions) for company, positions in positions_by_company.items()
+        }
+
+    def _pack(self, bits: np.ndarray) -> np.ndarray:
+        padded = np.zeros(self._n_words * 64, dtype=bool)
+        padded[: len(bits)] = bits
+        return np.packbits(padded, bitorder="little").view(np.uint64)
+
+    def _rows_mask(self, rows: List[int]) -> np.ndarray:
+        bits = np.zeros(len(self.questions), dtype=bool)
+        bits[rows] = True
+        return self._pack(bits)
+
+    @staticmethod
+    def _mask_indices(mask: np.ndarray) -> np.ndarray:
+        """Ascending indices of the set bits in a packed mask."""
+        return np.flatnonzero(np.unpackbits(mask.view(np.uint8), bitorder="little"))
 
     def load(self, path: Path = DATA_PATH):
         """Load questions from JSON file."""
         try:
-            with open(path, "r") as f:
-                raw = json.load(f)
-            self.questions = [Question(**q) for q in raw]
+            raw = orjson.loads(Path(path).read_bytes())
+            self.questions = QuestionListAdapter.validate_python(raw)
             self._companies = sorted(set(q.company for q in self.questions))
             self._positions = sorted(set(q.position for q in self.questions))
             logger.info(f"Loaded {len(self.questions)} questions from {path}")
@@ -39,6 +91,7 @@ class QuestionBank:
         except Exception as e:
             logger.error(f"Failed to load questions: {e}")
             self.questions = []
+        self._build_indexes()
 
     @property
     def companies(self) -> List[str]:
@@ -48,27 +101,39 @@ class QuestionBank:
     def positions(self) -> List[str]:
         return self._positions
 
-    def filter(
+    def _filter_mask(
         self,
         company: Optional[str] = None,
         position: Optional[str] = None,
         question_types: Optional[List[QuestionType]] = None,
-    ) -> List[Question]:
-        """Filter questions by criteria."""
-        result = self.questions
+    ) -> np.ndarray:
+        """Bitmap of questions matching all given criteria."""
+        result = self._all_mask
 
         if company:
-            result = [q for q in result if q.company.lower() == company.lower()]
+            result = result & self._mask_company.get(_norm(company), self._empty_mask)
 
         if position:
-            result = [q for q in result if q.position.lower() == position.lower()]
+            result = result & self._mask_position.get(_norm(position), self._empty_mask)
 
         if question_types:
-            type_set = set(question_types)
-            result = [q for q in result if q.type in type_set]
+            type_mask = self._empty_mask
+            for t in question_types:
+                type_mask = type_mask | self._mask_type.get(t, self._empty_mask)
+            result = result & type_mask
 
         return result
 
+    def filter(
+        self,
+        company: Optional[str] = None,
+        position: Optional[str] = None,
+        question_types: Optional[List[QuestionType]] = None,
+    ) -> List[Question]:
+        """Filter questions by criteria."""
+        mask = self._filter_mask(company, position, question_types)
+        return [self.questions[i] for i in self._mask_indices(mask)]
+
     def select(
         self,
         company: Optional[str] = None,
@@ -77,34 +142,33 @@ class QuestionBank:
         count: int = 5,
     ) -> List[Question]:
         """Select a random subset of questions matching criteria."""
-        pool = self.filter(company, position, question_types)
+        pool = self._filter_mask(company, position, question_types)
 
-        if not pool:
+        if not pool.any():
             # Fallback: try without position filter
-            pool = self.filter(company, question_types=question_types)
+            pool = self._filter_mask(company, question_types=question_types)
 
-        if not pool:
+        if not pool.any():
             # Fallback: try generic questions
-            pool = self.filter(company="Generic Tech", question_types=question_types)
-            pool += self.filter(company="Generic Non-Tech", question_types=question_types)
+            pool = self._filter_mask(company="Generic Tech", question_types=question_types)
+            pool = pool | self._filter_mask(company="Generic Non-Tech", question_types=question_types)
 
-        if not pool:
+        if not pool.any():
             # Fallback: any company, just match the requested types
-            pool = self.filter(question_types=question_types)
+            pool = self._filter_mask(question_types=question_types)
 
-        if not pool:
+        if not pool.any():
             # Absolute last resort: any questions
-            pool = self.questions
+            pool = self._all_mask
 
-        count = min(count, len(pool))
-        return random.sample(pool, count) if pool else []
+        indices = self._mask_indices(pool)
+        count = min(count, len(indices))
+        picks = self._rng.choice(indices, size=count, replace=False)
+        return [self.questions[i] for i in picks]
 
     def get_positions_for_company(self, company: str) -> List[str]:
         """Get available positions for a company."""
-        return sorted(set(
-            q.position for q in self.questions
-            if q.company.lower() == company.lower()
-        ))
+        return list(self._positions_by_company.get(_norm(company), []))
 
 
 # Singleton instance
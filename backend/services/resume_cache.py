@@ -1,64 +1,138 @@
 """
 Centralized cache for resume-generated interview questions.
 Extracted here to avoid circular imports between api/routes and services.
+
+Persisted as an append-only JSONL log: each set_questions appends one line,
+loading replays the log (last write wins), and cleanup compacts it.
+Disk writes from request handlers run in a worker thread.
+
+Entries are kept in LRU order (least recently used first), so trimming
+evicts from the front in O(excess).
 """
 
-import uuid
-import json
+import asyncio
+import os
+import time
 import logging
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
 
 class ResumeQuestionsCache:
     def __init__(self):
-        self.cache_file = Path("data/resume_questions_cache.json")
-        self.cache: Dict[str, Any] = {}
+        self.cache_file = Path("data/resume_questions_cache.jsonl")
+        # Pre-JSONL snapshot format, imported once if no log exists yet
+        self.legacy_cache_file = Path("data/resume_questions_cache.json")
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Serializes disk writes only; reads go straight to self.cache
+        self._write_lock = asyncio.Lock()
         self._load_cache()
 
     def _load_cache(self):
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, "r") as f:
-                    self.cache = json.load(f)
-                    logger.info(
-                        f"Loaded resume questions cache with {len(self.cache)} sessions"
-                    )
-            except Exception as e:
-                logger.error(f"Failed to load cache: {e}")
-                self.cache = {}
-
-    def _save_cache(self):
+        if not self.cache_file.exists():
+            self._migrate_legacy_cache()
+            return
+        try:
+            with open(self.cache_file, "rb+") as f:
+                data = f.read()
+                # A crash mid-append leaves a torn last line; cut it off so the
+                # next append starts on a fresh line instead of gluing onto it
+                end = data.rfind(b"\n") + 1
+                if end < len(data):
+                    logger.warning(f"Truncating torn trailing cache line ({len(data) - end} bytes)")
+                    f.truncate(end)
+            for line_no, line in enumerate(data[:end].splitlines(), 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    logger.warning(f"Skipping corrupt cache line {line_no}")
+                    continue
+                if not isinstance(record, dict) or "session_id" not in record:
+                    logger.warning(f"Skipping cache line {line_no} without a session_id")
+                    continue
+                session_id = record.pop("session_id")
+                # Later lines are more recent: re-insert at the end
+                self.cache.pop(session_id, None)
+                self.cache[session_id] = record
+            logger.info(
+                f"Loaded resume questions cache with {len(self.cache)} sessions"
+            )
+        except Exception as e:
+            logger.error(f"Failed to load cache: {e}")
+            self.cache = OrderedDict()
+
+    def _migrate_legacy_cache(self):
+        if not self.legacy_cache_file.exists():
+            return
+        try:
+            self.cache = OrderedDict(orjson.loads(self.legacy_cache_file.read_bytes()))
+            self._compact(list(self.cache.items()))
+            logger.info(
+                f"Migrated {len(self.cache)} sessions from {self.legacy_cache_file}"
+            )
+        except Exception as e:
+            logger.error(f"Failed to migrate legacy cache: {e}")
+            self.cache = OrderedDict()
+
+    @staticmethod
+    def _encode_record(session_id: str, entry: Dict[str, Any]) -> bytes:
+        return orjson.dumps({"session_id": session_id, **entry}) + b"\n"
+
+    def _append(self, session_id: str, entry: Dict[str, Any]):
         try:
             self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.cache_file, "w") as f:
-                json.dump(self.cache, f, indent=2)
-                logger.info(
-                    f"Saved resume questions cache with {len(self.cache)} sessions"
-                )
+            with open(self.cache_file, "ab") as f:
+                f.write(self._encode_record(session_id, entry))
         except Exception as e:
-            logger.error(f"Failed to save cache: {e}")
+            logger.error(f"Failed to append to cache: {e}")
 
-    def set_questions(self, session_id: str, questions: List[Any]):
-        self.cache[session_id] = {
+    def _compact(self, items: List[Tuple[str, Dict[str, Any]]]):
+        """Rewrite the log with only the given live entries, atomically."""
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix(".jsonl.tmp")
+            with open(tmp_file, "wb") as f:
+                for session_id, entry in items:
+                    f.write(self._encode_record(session_id, entry))
+            os.replace(tmp_file, self.cache_file)
+            logger.info(
+                f"Compacted resume questions cache to {len(items)} sessions"
+            )
+        except Exception as e:
+            logger.error(f"Failed to compact cache: {e}")
+
+    async def set_questions(self, session_id: str, questions: List[Any]):
+        entry = {
             "questions": questions,
-            "timestamp": str(uuid.uuid4()),
+            "timestamp": time.time(),
         }
-        self._save_cache()
+        self.cache.pop(session_id, None)
+        self.cache[session_id] = entry
+        async with self._write_lock:
+            await asyncio.to_thread(self._append, session_id, entry)
 
     def get_questions(self, session_id: str) -> Optional[Dict[str, Any]]:
-        return self.cache.get(session_id)
+        entry = self.cache.get(session_id)
+        if entry is not None:
+            self.cache.move_to_end(session_id)
+        return entry
 
-    def cleanup_old_sessions(self, max_sessions: int = 100):
-        if len(self.cache) > max_sessions:
-            sorted_sessions = sorted(
-                self.cache.items(),
-                key=lambda x: x[1].get("timestamp", ""),
-            )
-            self.cache = dict(sorted_sessions[-max_sessions:])
-            self._save_cache()
+    async def cleanup_old_sessions(self, max_sessions: int = 100):
+        if len(self.cache) <= max_sessions:
+            return
+        while len(self.cache) > max_sessions:
+            self.cache.popitem(last=False)
+        # Snapshot so the worker thread never iterates a dict being mutated
+        items = list(self.cache.items())
+        async with self._write_lock:
+            await asyncio.to_thread(self._compact, items)
 
 
 # Singleton
@@ -3,11 +3,15 @@ Session Manager - Manages interview session lifecycle.
 In-memory store with optional Firestore persistence.
 """
 
+import asyncio
 import time
 import uuid
 import logging
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List, Set
 
+from pydantic import ValidationError
+
+from config import settings
 from models.schemas import (
     InterviewSession,
     InterviewConfig,
@@ -15,6 +19,7 @@ from models.schemas import (
     InterviewPhase,
     TranscriptEntry,
     Question,
+    QuestionListAdapter,
 )
 from services.question_bank import question_bank
 from services.jd_question_generator import generate_questions_from_jd
@@ -24,11 +29,45 @@ from services import firestore_service
 logger = logging.getLogger(__name__)
 
 
+class _TranscriptGrouping:
+    """Question/answer pairs for evaluation, built up as transcript entries arrive."""
+
+    __slots__ = ("pairs", "current", "answer_parts")
+
+    def __init__(self):
+        self.pairs: List[dict] = []  # finished pairs
+        self.current: Optional[dict] = None  # question awaiting more answer turns
+        self.answer_parts: List[str] = []
+
+    def _render_current(self) -> dict:
+        return {**self.current, "answer": " ".join(self.answer_parts)}
+
+    def start_question(self, text: str, question: Optional[Question], question_id: str):
+        if self.current:
+            self.pairs.append(self._render_current())
+        self.current = {
+            "question": text,
+            "question_id": question_id,
+            "evaluation_criteria": question.evaluation_criteria if question else [],
+        }
+        self.answer_parts = []
+
+    def snapshot(self) -> List[dict]:
+        if not self.current:
+            return list(self.pairs)
+        return [*self.pairs, self._render_current()]
+
+
 class SessionManager:
     """Manages interview sessions in memory with Firestore backup."""
 
     def __init__(self):
         self._sessions: Dict[str, InterviewSession] = {}
+        self._transcripts: Dict[str, _TranscriptGrouping] = {}
+        self._question_by_id: Dict[str, Dict[str, Question]] = {}
+        self._phase_listeners: Dict[str, List[Callable[[InterviewPhase], None]]] = {}
+        # JD generations that outlived their session's wait; kept so they aren't GC'd
+        self._background_jd_tasks: Set[asyncio.Task] = set()
 
     async def create_session(self, config: InterviewConfig) -> InterviewSession:
         """Create a new interview session with selected questions."""
@@ -41,40 +80,62 @@ class SessionManager:
         if config.resume_session_id:
             cached = questions_cache.get_questions(config.resume_session_id)
             if cached:
-                raw_questions = cached.get("questions", [])
-                for i, q in enumerate(raw_questions):
-                    try:
-                        questions.append(Question(
-                            id=q.get("id", f"resume-{i}"),
-                            company=config.company,
-                            position=config.position,
-                            type=q.get("type", "behavioral"),
-                            difficulty=q.get("difficulty", "medium"),
-                            question=q.get("question", ""),
-                            follow_ups=[],
-                            evaluation_criteria=[],
-                            tags=["resume-based"],
-                        ))
-                    except Exception as e:
-                        logger.warning(f"Skipping malformed resume question {i}: {e}")
+                raw_list = [
+                    {
+                        "id": q.get("id", f"resume-{i}"),
+                        "company": config.company,
+                        "position": config.position,
+                        "type": q.get("type", "behavioral"),
+                        "difficulty": q.get("difficulty", "medium"),
+                        "question": q.get("question", ""),
+                        "tags": ["resume-based"],
+                    }
+                    for i, q in enumerate(cached.get("questions", []))
+                ]
+                try:
+                    questions = QuestionListAdapter.validate_python(raw_list)
+                except ValidationError:
+                    # Only pay for per-row validation when something is malformed
+                    for i, raw in enumerate(raw_list):
+                        try:
+                            questions.append(Question.model_validate(raw))
+                        except ValidationError as e:
+                            logger.warning(f"Skipping malformed resume question {i}: {e}")
                 logger.info(
                     f"Loaded {len(questions)} resume questions for session {session_id} "
                     f"from resume cache {config.resume_session_id}"
                 )
 
         if not questions and config.job_description:
+            jd_task = asyncio.create_task(generate_questions_from_jd(
+                job_description=config.job_description,
+                company=config.company,
+                position=config.position,
+                question_types=config.question_types,
+                count=config.question_count,
+            ))
+            timeout = settings.JD_GENERATION_TIMEOUT
             try:
-                questions, jd_summary = await generate_questions_from_jd(
-                    job_description=config.job_description,
-                    company=config.company,
-                    position=config.position,
-                    question_types=config.question_types,
-                    count=config.question_count,
+                done, _ = await asyncio.wait({jd_task}, timeout=timeout)
+            except asyncio.CancelledError:
+                # Nobody is waiting for the result any more
+                jd_task.cancel()
+                raise
+            if not done:
+                # Stop waiting, but let it finish so the JD cache still gets the entry
+                self._background_jd_tasks.add(jd_task)
+                jd_task.add_done_callback(self._on_background_jd_done)
+                logger.warning(
+                    f"JD question generation exceeded {timeout}s for session {session_id}, "
+                    f"falling back to static bank while it finishes in the background"
+                )
+            elif jd_task.exception():
+                logger.warning(
+                    f"JD question generation failed, falling back to static bank: {jd_task.exception()}"
                 )
+            else:
+                questions, jd_summary = jd_task.result()
                 logger.info(f"Generated {len(questions)} JD-tailored questions for session {session_id}")
-            except Exception as e:
-                logger.warning(f"JD question generation failed, falling back to static bank: {e}")
-                questions = []
 
         if not questions:
             questions = question_bank.select(
@@ -96,7 +157,7 @@ class SessionManager:
             created_at=time.time(),
         )
 
-        self._sessions[session_id] = session
+        self._register(session)
         await firestore_service.save_session(session_id, {
             "session_id": session_id,
             "candidate_name": config.candidate_name,
@@ -105,14 +166,57 @@ class SessionManager:
             "status": InterviewStatus.CREATED.value,
             "question_count": len(questions),
             "created_at": session.created_at,
+            "snapshot": session.to_msgpack(),
         })
         logger.info(f"Created session {session_id} with {len(questions)} questions")
         return session
 
+    def _on_background_jd_done(self, task: asyncio.Task):
+        self._background_jd_tasks.discard(task)
+        if task.cancelled():
+            return
+        if task.exception():
+            logger.warning(f"Background JD question generation failed: {task.exception()}")
+            return
+        questions, _ = task.result()
+        logger.info(f"Background JD question generation finished with {len(questions)} questions")
+
+    def _register(self, session: InterviewSession):
+        """Add a session to the in-memory store and build its lookup state."""
+        session_id = session.session_id
+        self._sessions[session_id] = session
+        self._transcripts[session_id] = _TranscriptGrouping()
+        self._question_by_id[session_id] = {q.id: q for q in session.questions}
+
+    def _refresh_snapshot(self, session: InterviewSession):
+        """Queue a snapshot so other workers' restored copies stay current.
+        Both values are deferred, so a burst of changes serializes the session once."""
+        firestore_service.queue_session_update(session.session_id, {
+            "status": lambda: session.status.value,
+            "snapshot": session.to_msgpack,
+        })
+
     def get_session(self, session_id: str) -> Optional[InterviewSession]:
         """Get a session by ID."""
         return self._sessions.get(session_id)
 
+    async def get_or_restore_session(self, session_id: str) -> Optional[InterviewSession]:
+        """Get a session by ID, falling back to a read-only copy of its Firestore
+        snapshot when this worker doesn't own it. The copy is not cached, so
+        every call sees the latest snapshot the owning worker wrote."""
+        session = self._sessions.get(session_id)
+        if session:
+            return session
+        doc = await firestore_service.get_session(session_id)
+        snapshot = doc.get("snapshot") if doc else None
+        if not snapshot:
+            return None
+        try:
+            return InterviewSession.from_msgpack(snapshot)
+        except Exception as e:
+            logger.error(f"Failed to restore session {session_id} from snapshot: {e}")
+            return None
+
     def update_phase(self, session_id: str, phase: InterviewPhase) -> bool:
         """Update the interview phase."""
         session = self._sessions.get(session_id)
@@ -124,14 +228,36 @@ class SessionManager:
             session.completed_at = time.time()
         elif phase == InterviewPhase.QUESTIONS:
             session.status = InterviewStatus.IN_PROGRESS
+        self._refresh_snapshot(session)
+        for listener in self._phase_listeners.get(session_id, ()):
+            listener(phase)
         return True
 
+    def register_phase_listener(
+        self, session_id: str, listener: Callable[[InterviewPhase], None]
+    ) -> None:
+        """Call listener with the new phase whenever update_phase runs for this session."""
+        self._phase_listeners.setdefault(session_id, []).append(listener)
+
+    def unregister_phase_listener(
+        self, session_id: str, listener: Callable[[InterviewPhase], None]
+    ) -> None:
+        """Remove a listener added with register_phase_listener."""
+        listeners = self._phase_listeners.get(session_id)
+        if not listeners:
+            return
+        if listener in listeners:
+            listeners.remove(listener)
+        if not listeners:
+            del self._phase_listeners[session_id]
+
     def update_status(self, session_id: str, status: InterviewStatus) -> bool:
         """Update the interview status."""
         session = self._sessions.get(session_id)
         if not session:
             return False
         session.status = status
+        self._refresh_snapshot(session)
         return True
 
     def add_transcript_entry(
@@ -147,8 +273,20 @@ class SessionManager:
             question_id=question_id,
             timestamp=time.time(),
         ))
+        self._group_entry(session_id, role, text, question_id)
         return True
 
+    def _group_entry(
+        self, session_id: str, role: str, text: str, question_id: Optional[str]
+    ):
+        grouping = self._transcripts[session_id]
+        if role == "interviewer" and question_id:
+            grouping.start_question(
+                text, self._question_by_id[session_id].get(question_id), question_id
+            )
+        elif role == "candidate" and grouping.current:
+            grouping.answer_parts.append(text)
+
     def get_next_question(self, session_id: str) -> Optional[Question]:
         """Get the next question for a session, advancing the index."""
         session = self._sessions.get(session_id)
@@ -158,6 +296,7 @@ class SessionManager:
             return None
         question = session.questions[session.current_question_index]
         session.current_question_index += 1
+        self._refresh_snapshot(session)
         return question
 
     def get_transcript_for_evaluation(self, session_id: str) -> Optional[List[dict]]:
@@ -165,45 +304,7 @@ class SessionManager:
         session = self._sessions.get(session_id)
         if not session:
             return None
-
-        # Group transcript entries by question
-        result = []
-        current_question = None
-        current_answer_parts = []
-
-        for entry in session.transcript:
-            if entry.role == "interviewer" and entry.question_id:
-                # Save previous Q&A pair
-                if current_question:
-                    q_obj = next(
-                        (q for q in session.questions if q.id == current_question["question_id"]),
-                        None,
-                    )
-                    result.append({
-                        "question": current_question["text"],
-                        "question_id": current_question["question_id"],
-                        "answer": " ".join(current_answer_parts),
-                        "evaluation_criteria": q_obj.evaluation_criteria if q_obj else [],
-                    })
-                current_question = {"text": entry.text, "question_id": entry.question_id}
-                current_answer_parts = []
-            elif entry.role == "candidate":
-                current_answer_parts.append(entry.text)
-
-        # Don't forget the last Q&A pair
-        if current_question:
-            q_obj = next(
-                (q for q in session.questions if q.id == current_question["question_id"]),
-                None,
-            )
-            result.append({
-                "question": current_question["text"],
-                "question_id": current_question["question_id"],
-                "answer": " ".join(current_answer_parts),
-                "evaluation_criteria": q_obj.evaluation_criteria if q_obj else [],
-            })
-
-        return result
+        return self._transcripts[session_id].snapshot()
 
     def store_feedback(self, session_id: str, feedback: dict) -> bool:
         """Store feedback report for a session."""
@@ -214,6 +315,7 @@ class SessionManager:
         self._feedback_store = getattr(self, "_feedback_store", {})
         self._feedback_store[session_id] = feedback
         session.status = InterviewStatus.EVALUATED
+        self._refresh_snapshot(session)
         return True
 
     def get_feedback(self, session_id: str) -> Optional[dict]:
@@ -1,21 +1,58 @@
 """
 Firebase Storage Service - Persists resume PDFs to Firebase Storage.
 Optional: falls back gracefully if Firebase Storage is not configured.
+
+The storage client is synchronous, so transfers run in worker threads and a
+semaphore caps how many are in flight at once.
 """
 
+import asyncio
 import logging
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Setting a chunk size makes the client use resumable, chunked transfers
+CHUNK_SIZE = 256 * 1024  # must be a multiple of 256 KiB
+TRANSFER_TIMEOUT = 60  # seconds per request
+MAX_CONCURRENT_TRANSFERS = 10
+
+_bucket = None
+_transfer_slots = asyncio.Semaphore(MAX_CONCURRENT_TRANSFERS)
+
+
+def _get_bucket():
+    """Default Firebase Storage bucket, resolved on first use."""
+    global _bucket
+    if _bucket is None:
+        from firebase_admin import storage
+        _bucket = storage.bucket()
+    return _bucket
+
+
+def _resume_blob(session_id: str):
+    return _get_bucket().blob(f"resumes/{session_id}.pdf", chunk_size=CHUNK_SIZE)
+
+
+def _download(blob, dest_path: str) -> bool:
+    if not blob.exists(timeout=TRANSFER_TIMEOUT):
+        return False
+    Path(dest_path).parent.mkdir(parents=True, exist_ok=True)
+    blob.download_to_filename(dest_path, timeout=TRANSFER_TIMEOUT)
+    return True
+
 
 async def upload_resume(session_id: str, file_path: str) -> bool:
     """Upload a resume PDF to Firebase Storage at resumes/{session_id}.pdf."""
     try:
-        from firebase_admin import storage
-        bucket = storage.bucket()
-        blob = bucket.blob(f"resumes/{session_id}.pdf")
-        blob.upload_from_filename(file_path, content_type="application/pdf")
+        blob = _resume_blob(session_id)
+        async with _transfer_slots:
+            await asyncio.to_thread(
+                blob.upload_from_filename,
+                file_path,
+                content_type="application/pdf",
+                timeout=TRANSFER_TIMEOUT,
+            )
         logger.info(f"Uploaded resume {session_id} to Firebase Storage")
         return True
     except Exception as e:
@@ -26,14 +63,12 @@ async def upload_resume(session_id: str, file_path: str) -> bool:
 async def download_resume(session_id: str, dest_path: str) -> bool:
     """Download a resume PDF from Firebase Storage to dest_path."""
     try:
-        from firebase_admin import storage
-        bucket = storage.bucket()
-        blob = bucket.blob(f"resumes/{session_id}.pdf")
-        if not blob.exists():
+        blob = _resume_blob(session_id)
+        async with _transfer_slots:
+            found = await asyncio.to_thread(_download, blob, dest_path)
+        if not found:
             logger.info(f"Resume {session_id} not found in Firebase Storage")
             return False
-        Path(dest_path).parent.mkdir(parents=True, exist_ok=True)
-        blob.download_to_filename(dest_path)
         logger.info(f"Downloaded resume {session_id} from Firebase Storage to {dest_path}")
         return True
     except Exception as e: